@@ -1,11 +1,27 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import os
 from datetime import datetime
 import random
 import barcode
 from barcode.writer import ImageWriter
 import io
+import re
+from functools import lru_cache
+import xlsxwriter
+from inventory_store import (
+    canonical_inventory, clean_and_stringify, format_rrp_series, inventory_store_path, inventory_version,
+    read_workbook_values, store_is_current, vec_clean_barcode, write_inventory_store,
+)
+
+try:
+    import python_calamine  # noqa: F401
+    HAS_CALAMINE = True
+except ImportError:
+    HAS_CALAMINE = False
+
+st.set_page_config(page_title="Inventory Manager", layout="wide")
 
 # --- Custom CSS for green buttons and narrower textfields ---
 st.markdown("""
@@ -33,12 +49,7 @@ st.markdown("""
     """, unsafe_allow_html=True)
 
 def clean_nans(df):
-    return df.replace([pd.NA, 'nan'], '', regex=True)
-
-def force_all_columns_to_string(df):
-    for col in df.columns:
-        df[col] = df[col].astype(str)
-    return df
+    return df.fillna('').replace('nan', '')
 
 def clean_barcode(val):
     if pd.isnull(val) or val == "":
@@ -58,8 +69,15 @@ def format_rrp(val):
     except Exception:
         return "$0.00"
 
+def file_mtime(path):
+    return os.path.getmtime(path) if os.path.exists(path) else None
+
+@st.cache_data(show_spinner=False)
+def list_inventory_files(folder, mtime):
+    return [f for f in os.listdir(folder) if f.lower().endswith(('.xlsx', '.csv'))]
+
 INVENTORY_FOLDER = os.path.join(os.path.dirname(__file__), "Inventory")
-inventory_files = [f for f in os.listdir(INVENTORY_FOLDER) if f.lower().endswith(('.xlsx', '.csv'))]
+inventory_files = list_inventory_files(INVENTORY_FOLDER, file_mtime(INVENTORY_FOLDER))
 
 if not inventory_files:
     st.error("No inventory files found in the 'Inventory' folder.")
@@ -72,118 +90,218 @@ if len(inventory_files) > 1:
 INVENTORY_FILE = os.path.join(INVENTORY_FOLDER, selected_file)
 ARCHIVE_FOLDER = INVENTORY_FOLDER
 ARCHIVE_FILE = os.path.join(ARCHIVE_FOLDER, "archive_inventory.xlsx")
+CACHE_MAX_ENTRIES = 4
 
-st.set_page_config(page_title="Inventory Manager", layout="wide")
-
-def load_inventory():
-    if os.path.exists(INVENTORY_FILE):
-        if INVENTORY_FILE.lower().endswith('.xlsx'):
-            df = pd.read_excel(INVENTORY_FILE)
-        elif INVENTORY_FILE.lower().endswith('.csv'):
-            df = pd.read_csv(INVENTORY_FILE)
+def read_excel_values(path):
+    if HAS_CALAMINE:
+        df = pd.read_excel(path, engine="calamine", dtype=str)
+    else:
+        df = read_workbook_values(path)
+    return df.replace("", np.nan)
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)
+def load_inventory(path, mtime):
+    if os.path.exists(path):
+        if store_is_current(path):
+            return pd.read_parquet(inventory_store_path(path)).astype("string[pyarrow]")
+        if path.lower().endswith('.xlsx'):
+            df = read_excel_values(path)
+        elif path.lower().endswith('.csv'):
+            df = pd.read_csv(path)
         else:
             st.error("Unsupported inventory file type.")
             st.stop()
-        df = force_all_columns_to_string(df)
-        df.rename(columns={"FRAME NO.": "FRAMENUM"}, inplace=True)
-        if "BARCODE" in df.columns:
-            df["BARCODE"] = df["BARCODE"].map(clean_barcode)
-            cols = list(df.columns)
-            cols.insert(0, cols.pop(cols.index("BARCODE")))
-            df = df[cols]
-        if "RRP" in df.columns:
-            df["RRP"] = df["RRP"].apply(lambda x: str(x).replace("$", "").strip())
-        return df
+        return canonical_inventory(df)
     else:
-        st.error(f"Inventory file '{INVENTORY_FILE}' not found.")
+        st.error(f"Inventory file '{path}' not found.")
         st.stop()
 
-def load_archive_inventory():
-    if os.path.exists(ARCHIVE_FILE):
-        df = pd.read_excel(ARCHIVE_FILE)
-        df = force_all_columns_to_string(df)
+def clean_row(row):
+    cleaned = {}
+    for col, val in row.items():
+        val = "" if pd.isnull(val) else str(val)
+        cleaned[col] = "" if val == "nan" else val
+    if "BARCODE" in cleaned:
+        cleaned["BARCODE"] = clean_barcode(cleaned["BARCODE"])
+    if "RRP" in cleaned:
+        cleaned["RRP"] = format_rrp(cleaned["RRP"])
+    return cleaned
+
+def write_xlsx(df, target):
+    workbook = xlsxwriter.Workbook(target, {'constant_memory': True})
+    worksheet = workbook.add_worksheet()
+    worksheet.write_row(0, 0, list(df.columns))
+    for i, row in enumerate(df.itertuples(index=False, name=None), start=1):
+        worksheet.write_row(i, 0, row)
+    workbook.close()
+
+def save_inventory(df, path):
+    if path.lower().endswith('.xlsx'):
+        write_inventory_store(df, path)
+    else:
+        df.to_csv(path, index=False)
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)
+def load_framecode_index(path, mtime):
+    df = load_inventory(path, mtime)
+    return pd.Index(vec_clean_barcode(df["FRAMENUM"]))
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)
+def load_product_labels(path, mtime):
+    df = load_inventory(path, mtime)
+    return (df["BARCODE"] + " - " + load_framecode_index(path, mtime)).tolist()
+
+def format_for_display(df):
+    if "RRP" not in df.columns and "BARCODE" not in df.columns:
+        return clean_nans(df)
+    display = df.copy()
+    if "RRP" in display.columns:
+        display["RRP"] = format_rrp_series(display["RRP"])
+    if "BARCODE" in display.columns:
+        display["BARCODE"] = vec_clean_barcode(display["BARCODE"])
+    return clean_nans(display)
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)
+def excel_bytes(path, mtime):
+    with open(path, "rb") as f:
+        return f.read()
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)
+def display_inventory(path, mtime, archive=False):
+    if archive:
+        return format_for_display(load_archive_inventory(path, mtime))
+    return format_for_display(load_inventory(path, mtime))
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)
+def csv_bytes(path, mtime, archive=False):
+    return display_inventory(path, mtime, archive).to_csv(index=False).encode('utf-8')
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)
+def xlsx_bytes(path, mtime):
+    buffer = io.BytesIO()
+    write_xlsx(display_inventory(path, mtime), buffer)
+    return buffer.getvalue()
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)
+def load_archive_inventory(path, mtime):
+    if os.path.exists(path):
+        df = read_excel_values(path)
+        df = clean_and_stringify(df)
         df.rename(columns={"FRAME NO.": "FRAMENUM"}, inplace=True)
         if "BARCODE" in df.columns:
-            df["BARCODE"] = df["BARCODE"].map(clean_barcode)
+            df["BARCODE"] = vec_clean_barcode(df["BARCODE"])
             cols = list(df.columns)
             cols.insert(0, cols.pop(cols.index("BARCODE")))
             df = df[cols]
         if "RRP" in df.columns:
-            df["RRP"] = df["RRP"].apply(lambda x: str(x).replace("$", "").strip())
-        return df
+            df["RRP"] = df["RRP"].astype(str).str.replace("$", "", regex=False).str.strip()
+        return df.astype("string[pyarrow]")
     else:
         return pd.DataFrame()
 
-def generate_unique_barcode(df):
-    while True:
-        barcode_val = f"{random.randint(1, 15000):05d}"
-        barcode_val_clean = clean_barcode(barcode_val)
-        if "BARCODE" not in df.columns or barcode_val_clean not in df["BARCODE"].map(clean_barcode).values:
-            return barcode_val_clean
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)
+def read_scanned_file(name, data):
+    if name.endswith(".csv") or name.endswith(".txt"):
+        return pd.read_csv(io.BytesIO(data), dtype=str, engine="c", na_filter=False)
+    if name.endswith(".xlsx"):
+        return pd.read_excel(io.BytesIO(data), dtype=str, na_filter=False)
+    return None
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)
+def scanned_barcode_index(name, data, column):
+    return pd.Index(vec_clean_barcode(read_scanned_file(name, data)[column]))
+
+def show_stock_count_rows(rows):
+    st.dataframe(rows.head(STOCK_COUNT_PREVIEW_ROWS), width='stretch')
+    if len(rows) > STOCK_COUNT_PREVIEW_ROWS:
+        st.caption(f"Showing the first {STOCK_COUNT_PREVIEW_ROWS} of {len(rows)} rows.")
+
+def exists_in_other_row(index, value, row):
+    if value not in index:
+        return False
+    return (index.get_indexer_for([value]) != row).any()
+
+def generate_unique_barcode(barcode_index):
+    used = set(barcode_index)
+    free = [i for i in range(1, 15001) if str(i) not in used]
+    if not free:
+        return None
+    return str(random.choice(free))
+
+@lru_cache(maxsize=None)
+def framecode_pattern(prefix):
+    return re.compile(rf"^{re.escape(prefix)}.*?(\d{{6}})", re.DOTALL)
 
 def generate_framecode(supplier, df):
     prefix = supplier[:3].upper()
     frame_col = "FRAMENUM"
     if frame_col not in df.columns:
         return prefix + "000001"
-    framecodes = df[frame_col].dropna().astype(str)
-    matching = framecodes[framecodes.str.startswith(prefix)]
-    nums = matching.str[len(prefix):].str.extract(r'(\d{6})')[0].dropna()
+    nums = df[frame_col].astype(str).str.extract(framecode_pattern(prefix), expand=False).dropna()
     if not nums.empty:
-        max_num = int(nums.max())
-        next_num = max_num + 1
+        next_num = int(nums.max()) + 1
     else:
         next_num = 1
     return f"{prefix}{next_num:06d}"
 
+CODE128 = barcode.get_barcode_class('code128')
+BARCODE_WRITER_OPTIONS = {"write_text": False}
+
+@st.cache_data(show_spinner=False, max_entries=512)
 def generate_barcode_image(code):
     try:
-        CODE128 = barcode.get_barcode_class('code128')
         code = str(code)
         if not code:
             st.error("Barcode value cannot be empty.")
             return None
         my_code = CODE128(code, writer=ImageWriter())
         buffer = io.BytesIO()
-        my_code.write(buffer, options={"write_text": False})
-        buffer.seek(0)
-        return buffer
+        my_code.write(buffer, options=BARCODE_WRITER_OPTIONS)
+        return buffer.getvalue()
     except Exception as e:
         st.error(f"Error generating barcode image: {e}")
         return None
 
-def get_smart_default(header, df):
-    if header in df.columns and not df[header].dropna().empty:
-        recent = df[header].dropna().iloc[-1]
-        if recent: return str(recent)
-    if header in df.columns and not df[header].dropna().empty:
-        most_common = df[header].dropna().mode()
-        if not most_common.empty: return str(most_common.iloc[0])
-    if header == "MANUFACT":
-        return "Ray-Ban"
-    if header == "SUPPLIER":
-        return "Default Supplier"
-    if header == "F TYPE":
-        return "MEN"
-    if header == "FRAMETYPE":
-        return "MEN"
-    if header == "RRP":
-        return "120.00"
-    if header == "EXCOSTPR":
-        return "60.00"
-    if header == "COST PRICE":
-        return "70.00"
-    if header == "TAXPC":
-        return "GST 10%"
+SMART_DEFAULT_FALLBACKS = {
+    "MANUFACT": "Ray-Ban",
+    "SUPPLIER": "Default Supplier",
+    "F TYPE": "MEN",
+    "FRAMETYPE": "MEN",
+    "RRP": "120.00",
+    "EXCOSTPR": "60.00",
+    "COST PRICE": "70.00",
+    "TAXPC": "GST 10%",
+    "FRSTATUS": "PRACTICE OWNED",
+}
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)
+def load_smart_defaults(path, mtime):
+    df = load_inventory(path, mtime)
+    defaults = {}
+    for header in df.columns:
+        values = df[header].dropna()
+        if values.empty:
+            continue
+        recent = values.iloc[-1]
+        if recent:
+            defaults[header] = str(recent)
+            continue
+        most_common = values.mode()
+        if not most_common.empty:
+            defaults[header] = str(most_common.iloc[0])
+    return defaults
+
+def get_smart_default(header, smart_defaults):
+    if header in smart_defaults:
+        return smart_defaults[header]
     if header == "AVAILFROM":
         return datetime.now().date()
-    if header == "FRSTATUS":
-        return "PRACTICE OWNED"
-    if header == "NOTE":
-        return ""
-    if header == "FCOLOUR":
-        return ""
-    return ""
+    return SMART_DEFAULT_FALLBACKS.get(header, "")
+
+def clear_inventory_caches():
+    for cached in (load_inventory, load_framecode_index, load_product_labels, load_smart_defaults,
+                   display_inventory, csv_bytes, xlsx_bytes, excel_bytes):
+        cached.clear()
 
 VISIBLE_FIELDS = [
     "BARCODE", "LOCATION", "FRAMENUM", "MANUFACT", "MODEL", "SIZE",
@@ -198,7 +316,19 @@ FRAMETYPE_OPTIONS = ["MEN", "WOMEN", "KIDS", "UNISEX"]
 F_TYPE_OPTIONS = ["MEN", "WOMEN", "KIDS", "UNISEX"]
 FRSTATUS_OPTIONS = ["CONSIGNMENT OWNED", "PRACTICE OWNED"]
 TAXPC_OPTIONS = [f"GST {i}%" for i in range(1, 21)]
-SIZE_OPTIONS = [f"{i:02d}-{j:02d}" for i in range(100) for j in range(100)]
+FRAMETYPE_INDEX = {option: i for i, option in enumerate(FRAMETYPE_OPTIONS)}
+F_TYPE_INDEX = {option: i for i, option in enumerate(F_TYPE_OPTIONS)}
+FRSTATUS_INDEX = {option: i for i, option in enumerate(FRSTATUS_OPTIONS)}
+TAXPC_INDEX = {option: i for i, option in enumerate(TAXPC_OPTIONS)}
+INVENTORY_PAGE_SIZE = 100
+STOCK_COUNT_PREVIEW_ROWS = 1000
+
+@st.cache_resource
+def size_options():
+    options = tuple(f"{i:02d}-{j:02d}" for i in range(100) for j in range(100))
+    return options, {option: i for i, option in enumerate(options)}
+
+SIZE_OPTIONS, SIZE_INDEX = size_options()
 
 if "add_product_expanded" not in st.session_state:
     st.session_state["add_product_expanded"] = False
@@ -221,8 +351,8 @@ if "supplier_for_framecode" not in st.session_state:
 if "last_deleted_product" not in st.session_state:
     st.session_state["last_deleted_product"] = None
 
-df = load_inventory()
-archive_df = load_archive_inventory()
+inventory_mtime = inventory_version(INVENTORY_FILE)
+df = load_inventory(INVENTORY_FILE, inventory_mtime)
 columns = list(df.columns)
 barcode_col = "BARCODE"
 framecode_col = "FRAMENUM"
@@ -232,7 +362,16 @@ if barcode_col not in columns or framecode_col not in columns:
     st.write("Found columns:", columns)
     st.stop()
 
+# BARCODE is already cleaned by load_inventory, so this index is built once per run
+barcode_index = pd.Index(df[barcode_col])
+framecode_index = load_framecode_index(INVENTORY_FILE, inventory_mtime)
+smart_defaults = load_smart_defaults(INVENTORY_FILE, inventory_mtime)
+
 headers = [h for h in columns if h.lower() != "timestamp"]
+visible_headers = [h for h in VISIBLE_FIELDS if h in headers and h != "PKEY"]
+if "AVAILFROM" not in visible_headers:
+    visible_headers.append("AVAILFROM")
+header_rows = [visible_headers[i:i+3] for i in range(0, len(visible_headers), 3)]
 
 st.title("Inventory Manager")
 
@@ -240,9 +379,13 @@ st.markdown("#### Generate Unique Barcodes")
 btn_col1, btn_col2 = st.columns(2)
 with btn_col1:
     if st.button("Generate Barcode", key="generate_barcode_btn"):
-        st.session_state["barcode"] = generate_unique_barcode(df)
-        st.session_state["barcode_textinput"] = st.session_state["barcode"]
-        st.session_state["add_product_expanded"] = True
+        new_barcode = generate_unique_barcode(barcode_index)
+        if new_barcode:
+            st.session_state["barcode"] = new_barcode
+            st.session_state["barcode_textinput"] = new_barcode
+            st.session_state["add_product_expanded"] = True
+        else:
+            st.warning("⚠️ All barcodes from 1 to 15000 are already in use.")
 with btn_col2:
     supplier_val = st.text_input(
         "Enter Supplier for Framecode Generation",
@@ -259,307 +402,269 @@ with btn_col2:
 
 if st.session_state["barcode"]:
     st.markdown("#### Barcode Image")
-    img_buffer = generate_barcode_image(st.session_state["barcode"])
-    if img_buffer:
-        st.image(img_buffer, width=220)
-
-with st.expander("➕ Add a New Product", expanded=st.session_state["add_product_expanded"]):
-    input_values = {}
-    n_cols = 3
-    visible_headers = [h for h in VISIBLE_FIELDS if h in headers]
-    visible_headers = [h for h in visible_headers if h != "PKEY"]
-    if "AVAILFROM" not in visible_headers:
-        visible_headers.append("AVAILFROM")
-    header_rows = [visible_headers[i:i+n_cols] for i in range(0, len(visible_headers), n_cols)]
-    st.markdown("**Enter New Product Details:**")
-    required_fields = [barcode_col, framecode_col]
-    for row in header_rows:
-        cols = st.columns(len(row), gap="small")
-        for idx, header in enumerate(row):
-            with cols[idx]:
-                unique_key = f"textinput_{header}"
-                smart_suggestion = get_smart_default(header, df)
-                if header == barcode_col:
-                    input_values[header] = st.text_input(
-                        "BARCODE", key="barcode_textinput", help="Unique product barcode"
-                    )
-                elif header == framecode_col:
-                    input_values[header] = st.text_input(
-                        "FRAMENUM", value=st.session_state["framecode"], key=unique_key, help="Unique product frame code"
-                    )
-                elif header.upper() == "MANUFACT":
-                    input_values[header] = st.text_input("MANUFACTURER", value=smart_suggestion, key=unique_key)
-                elif header.upper() == "FCOLOUR":
-                    input_values[header] = st.text_input("COLOUR", value=smart_suggestion, key=unique_key)
-                elif header.upper() == "FRAMETYPE":
-                    default_frametype = smart_suggestion if smart_suggestion in FRAMETYPE_OPTIONS else FRAMETYPE_OPTIONS[0]
-                    input_values[header] = st.selectbox("FRAME TYPE", FRAMETYPE_OPTIONS, index=FRAMETYPE_OPTIONS.index(default_frametype), key=unique_key)
-                elif header.upper() == "AVAILFROM":
-                    input_values[header] = st.date_input("AVAILABLE FROM", value=datetime.now().date(), key=unique_key)
-                elif header.upper() == "SUPPLIER":
-                    input_values[header] = st.text_input(header, value=st.session_state.get("supplier_for_framecode", ""), key=unique_key)
-                elif header.lower() == "model":
-                    input_values[header] = st.text_input(header, value=smart_suggestion, key=unique_key)
-                elif header.lower() == "size":
-                    default_size = smart_suggestion if smart_suggestion in SIZE_OPTIONS else SIZE_OPTIONS[0]
-                    input_values[header] = st.selectbox(header, SIZE_OPTIONS, index=SIZE_OPTIONS.index(default_size), key=unique_key)
-                elif header.upper() in FREE_TEXT_FIELDS:
-                    input_values[header] = st.text_input(header, value=smart_suggestion, key=unique_key)
-                elif header.upper() == "QUANTITY":
-                    try:
-                        default_qty = int(smart_suggestion) if smart_suggestion.isdigit() else 1
-                    except:
-                        default_qty = 1
-                    input_values[header] = st.number_input(header, min_value=0, value=default_qty, key=unique_key)
-                elif header.upper() == "F TYPE":
-                    default_ftype = smart_suggestion if smart_suggestion in F_TYPE_OPTIONS else F_TYPE_OPTIONS[0]
-                    input_values[header] = st.selectbox(header, F_TYPE_OPTIONS, index=F_TYPE_OPTIONS.index(default_ftype), key=unique_key)
-                elif header.upper() == "FRSTATUS":
-                    default_status = smart_suggestion if smart_suggestion in FRSTATUS_OPTIONS else FRSTATUS_OPTIONS[1]
-                    input_values[header] = st.selectbox(header, FRSTATUS_OPTIONS, index=FRSTATUS_OPTIONS.index(default_status), key=unique_key)
-                elif header.upper() in ["TEMPLE", "DEPTH", "DIAG", "EXCOSTPR", "COST PRICE"]:
-                    input_values[header] = st.text_input(header, value=smart_suggestion, key=unique_key)
-                elif header.upper() == "RRP":
-                    input_values[header] = st.text_input(header, value=format_rrp(smart_suggestion), key=unique_key)
-                elif header.upper() == "TAXPC":
-                    default_tax = smart_suggestion if smart_suggestion in TAXPC_OPTIONS else TAXPC_OPTIONS[9]
-                    input_values[header] = st.selectbox(header, TAXPC_OPTIONS, index=max(0, TAXPC_OPTIONS.index(default_tax)), key=unique_key)
-                elif header.upper() == "NOTE":
-                    input_values[header] = st.text_input(header, value=smart_suggestion, key=unique_key)
-                else:
-                    input_values[header] = st.text_input(header, value=smart_suggestion, key=unique_key)
-    with st.form(key="add_product_form"):
-        st.markdown("Click 'Add Product' to submit the details above.")
-        submit = st.form_submit_button("Add Product")
-        if submit:
-            required_fields = [barcode_col, framecode_col]
-            missing = [field for field in required_fields if field in visible_headers and not input_values.get(field)]
-            barcode_cleaned = clean_barcode(st.session_state["barcode_textinput"])
-            framecode_cleaned = clean_barcode(input_values.get(framecode_col, ""))
-            df_barcodes_cleaned = df[barcode_col].map(clean_barcode)
-            df_framecodes_cleaned = df[framecode_col].map(clean_barcode)
-            if missing:
-                st.warning(f"⚠️ {', '.join(missing)} are required.")
-            elif barcode_cleaned in df_barcodes_cleaned.values:
-                st.error("❌ This barcode already exists in inventory!")
-            elif framecode_cleaned in df_framecodes_cleaned.values:
-                st.error("❌ This framecode already exists in inventory!")
-            else:
-                new_row = {}
-                for col in headers:
-                    if col == barcode_col:
-                        val = clean_barcode(st.session_state["barcode_textinput"])
-                    elif col in input_values:
-                        val = input_values[col]
-                        if col == "AVAILFROM" and isinstance(val, (datetime, pd.Timestamp)):
-                            val = val.strftime('%Y-%m-%d')
-                        if col == "RRP":
-                            val = format_rrp(val)
+    img_bytes = generate_barcode_image(st.session_state["barcode"])
+    if img_bytes:
+        st.image(img_bytes, width=220)
+
+@st.fragment
+def add_product_section():
+    with st.expander("➕ Add a New Product", expanded=st.session_state["add_product_expanded"]):
+        input_values = {}
+        st.markdown("**Enter New Product Details:**")
+        required_fields = [barcode_col, framecode_col]
+        for row in header_rows:
+            cols = st.columns(len(row), gap="small")
+            for idx, header in enumerate(row):
+                with cols[idx]:
+                    unique_key = f"textinput_{header}"
+                    smart_suggestion = get_smart_default(header, smart_defaults)
+                    if header == barcode_col:
+                        input_values[header] = st.text_input(
+                            "BARCODE", key="barcode_textinput", help="Unique product barcode"
+                        )
+                    elif header == framecode_col:
+                        input_values[header] = st.text_input(
+                            "FRAMENUM", value=st.session_state["framecode"], key=unique_key, help="Unique product frame code"
+                        )
+                    elif header.upper() == "MANUFACT":
+                        input_values[header] = st.text_input("MANUFACTURER", value=smart_suggestion, key=unique_key)
+                    elif header.upper() == "FCOLOUR":
+                        input_values[header] = st.text_input("COLOUR", value=smart_suggestion, key=unique_key)
+                    elif header.upper() == "FRAMETYPE":
+                        input_values[header] = st.selectbox("FRAME TYPE", FRAMETYPE_OPTIONS, index=FRAMETYPE_INDEX.get(smart_suggestion, 0), key=unique_key)
+                    elif header.upper() == "AVAILFROM":
+                        input_values[header] = st.date_input("AVAILABLE FROM", value=datetime.now().date(), key=unique_key)
+                    elif header.upper() == "SUPPLIER":
+                        input_values[header] = st.text_input(header, value=st.session_state.get("supplier_for_framecode", ""), key=unique_key)
+                    elif header.lower() == "model":
+                        input_values[header] = st.text_input(header, value=smart_suggestion, key=unique_key)
+                    elif header.lower() == "size":
+                        input_values[header] = st.selectbox(header, SIZE_OPTIONS, index=SIZE_INDEX.get(smart_suggestion, 0), key=unique_key)
+                    elif header.upper() in FREE_TEXT_FIELDS:
+                        input_values[header] = st.text_input(header, value=smart_suggestion, key=unique_key)
+                    elif header.upper() == "QUANTITY":
+                        try:
+                            default_qty = int(smart_suggestion) if smart_suggestion.isdigit() else 1
+                        except:
+                            default_qty = 1
+                        input_values[header] = st.number_input(header, min_value=0, value=default_qty, key=unique_key)
+                    elif header.upper() == "F TYPE":
+                        input_values[header] = st.selectbox(header, F_TYPE_OPTIONS, index=F_TYPE_INDEX.get(smart_suggestion, 0), key=unique_key)
+                    elif header.upper() == "FRSTATUS":
+                        input_values[header] = st.selectbox(header, FRSTATUS_OPTIONS, index=FRSTATUS_INDEX.get(smart_suggestion, 1), key=unique_key)
+                    elif header.upper() in ["TEMPLE", "DEPTH", "DIAG", "EXCOSTPR", "COST PRICE"]:
+                        input_values[header] = st.text_input(header, value=smart_suggestion, key=unique_key)
+                    elif header.upper() == "RRP":
+                        input_values[header] = st.text_input(header, value=format_rrp(smart_suggestion), key=unique_key)
+                    elif header.upper() == "TAXPC":
+                        input_values[header] = st.selectbox(header, TAXPC_OPTIONS, index=TAXPC_INDEX.get(smart_suggestion, 9), key=unique_key)
+                    elif header.upper() == "NOTE":
+                        input_values[header] = st.text_input(header, value=smart_suggestion, key=unique_key)
                     else:
-                        val = ""
-                    new_row[col] = val
-                if "Timestamp" in df.columns:
-                    new_row["Timestamp"] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-                df = clean_nans(df)
-                df = force_all_columns_to_string(df)
-                df[barcode_col] = df[barcode_col].map(clean_barcode)
-                if "RRP" in df.columns:
-                    df["RRP"] = df["RRP"].apply(format_rrp)
-                if INVENTORY_FILE.lower().endswith('.xlsx'):
-                    df.to_excel(INVENTORY_FILE, index=False)
+                        input_values[header] = st.text_input(header, value=smart_suggestion, key=unique_key)
+        with st.form(key="add_product_form"):
+            st.markdown("Click 'Add Product' to submit the details above.")
+            submit = st.form_submit_button("Add Product")
+            if submit:
+                required_fields = [barcode_col, framecode_col]
+                missing = [field for field in required_fields if field in visible_headers and not input_values.get(field)]
+                barcode_cleaned = clean_barcode(st.session_state["barcode_textinput"])
+                framecode_cleaned = clean_barcode(input_values.get(framecode_col, ""))
+                if missing:
+                    st.warning(f"⚠️ {', '.join(missing)} are required.")
+                elif barcode_cleaned in barcode_index:
+                    st.error("❌ This barcode already exists in inventory!")
+                elif framecode_cleaned in framecode_index:
+                    st.error("❌ This framecode already exists in inventory!")
                 else:
-                    df.to_csv(INVENTORY_FILE, index=False)
-                st.success(f"✅ Product added successfully!")
-                st.session_state["barcode"] = ""
-                st.session_state["barcode_textinput"] = ""
-                st.session_state["framecode"] = ""
-                st.session_state["add_product_expanded"] = False
-                st.rerun()
+                    new_row = {}
+                    for col in headers:
+                        if col == barcode_col:
+                            val = st.session_state["barcode_textinput"]
+                        elif col in input_values:
+                            val = input_values[col]
+                            if col == "AVAILFROM" and isinstance(val, (datetime, pd.Timestamp)):
+                                val = val.strftime('%Y-%m-%d')
+                        else:
+                            val = ""
+                        new_row[col] = val
+                    if "Timestamp" in df.columns:
+                        new_row["Timestamp"] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                    new_row = clean_row({col: new_row.get(col, "") for col in df.columns})
+                    added = pd.DataFrame([new_row], columns=df.columns, dtype="string[pyarrow]")
+                    save_inventory(pd.concat([df, added], ignore_index=True), INVENTORY_FILE)
+                    clear_inventory_caches()
+                    st.success(f"✅ Product added successfully!")
+                    st.session_state["barcode"] = ""
+                    st.session_state["barcode_textinput"] = ""
+                    st.session_state["framecode"] = ""
+                    st.session_state["add_product_expanded"] = False
+                    st.rerun()
+
+add_product_section()
 
 st.markdown('### Current Inventory')
-df_display = df.copy()
-if "RRP" in df_display.columns:
-    df_display["RRP"] = df_display["RRP"].apply(format_rrp).astype(str)
-if "BARCODE" in df_display.columns:
-    df_display["BARCODE"] = df_display["BARCODE"].map(clean_barcode)
-st.dataframe(clean_nans(df_display), width='stretch')
+df_display = display_inventory(INVENTORY_FILE, inventory_mtime)
+page_count = max(1, -(-len(df_display) // INVENTORY_PAGE_SIZE))
+st.session_state.setdefault("inventory_page", 1)
+if st.session_state["inventory_page"] > page_count:
+    st.session_state["inventory_page"] = page_count
+page = st.number_input("Page", min_value=1, max_value=page_count, key="inventory_page")
+page_start = (page - 1) * INVENTORY_PAGE_SIZE
+st.caption(f"Showing rows {page_start + 1}-{min(page_start + INVENTORY_PAGE_SIZE, len(df_display))} of {len(df_display)}")
+st.dataframe(df_display.iloc[page_start:page_start + INVENTORY_PAGE_SIZE], width='stretch')
 
 download_date_str = datetime.now().strftime("%Y-%m-%d")
 custom_download_name = f"fil-{selected_file.split('.')[0]}_{download_date_str}-downloaded"
-excel_buffer = io.BytesIO()
-df_display["RRP"] = df_display["RRP"].astype(str)
-clean_nans(df_display).to_excel(excel_buffer, index=False)
-excel_buffer.seek(0)
 st.download_button(
     label="📄 Download as Excel",
-    data=excel_buffer,
+    data=xlsx_bytes(INVENTORY_FILE, inventory_mtime),
     file_name=f"{custom_download_name}.xlsx",
     mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
 )
 st.download_button(
     label="🗂️ Download as CSV",
-    data=clean_nans(df_display).to_csv(index=False).encode('utf-8'),
+    data=csv_bytes(INVENTORY_FILE, inventory_mtime),
     file_name=f"{custom_download_name}.csv",
     mime="text/csv"
 )
 
+archive_df = pd.DataFrame()
+if os.path.exists(ARCHIVE_FILE) and st.checkbox("Show archive inventory", key="show_archive"):
+    archive_mtime = file_mtime(ARCHIVE_FILE)
+    archive_df = load_archive_inventory(ARCHIVE_FILE, archive_mtime)
+
 if not archive_df.empty:
     st.markdown("### Archive Inventory")
-    archive_df_display = archive_df.copy()
-    if "RRP" in archive_df_display.columns:
-        archive_df_display["RRP"] = archive_df_display["RRP"].apply(format_rrp).astype(str)
-    if "BARCODE" in archive_df_display.columns:
-        archive_df_display["BARCODE"] = archive_df_display["BARCODE"].map(clean_barcode)
-    st.dataframe(clean_nans(archive_df_display), width='stretch')
+    archive_df_display = display_inventory(ARCHIVE_FILE, archive_mtime, archive=True)
+    st.dataframe(archive_df_display, width='stretch')
     archive_download_name = f"fil-archive_{download_date_str}-downloaded"
     arch_col1, arch_col2 = st.columns([1, 1])
     with arch_col1:
         st.download_button(
             label="📄 Archive Excel",
-            data=open(ARCHIVE_FILE, "rb").read(),
+            data=excel_bytes(ARCHIVE_FILE, archive_mtime),
             file_name=f"{archive_download_name}.xlsx",
             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
         )
     with arch_col2:
-        archive_csv_bytes = clean_nans(archive_df_display).to_csv(index=False).encode('utf-8')
         st.download_button(
             label="🗂️ Archive CSV",
-            data=archive_csv_bytes,
+            data=csv_bytes(ARCHIVE_FILE, archive_mtime, archive=True),
             file_name=f"{archive_download_name}.csv",
             mime="text/csv"
         )
 
-with st.expander("✏️ Edit or 🗑 Delete Products", expanded=st.session_state["edit_delete_expanded"]):
-    if len(df) > 0:
-        selected_row = st.selectbox(
-            "Select a product to edit or delete",
-            options=df.index.tolist(),
-            format_func=lambda i: f"{clean_barcode(df.at[i, barcode_col])} - {clean_barcode(df.at[i, framecode_col])}",
-            key="selected_product"
-        )
-        if selected_row is not None:
-            st.session_state["edit_product_index"] = selected_row
-            product = df.loc[selected_row]
-            edit_values = {}
-            n_cols = 3
-            visible_headers = [h for h in VISIBLE_FIELDS if h in headers]
-            visible_headers = [h for h in visible_headers if h != "PKEY"]
-            if "AVAILFROM" not in visible_headers:
-                visible_headers.append("AVAILFROM")
-            header_rows = [visible_headers[i:i+n_cols] for i in range(0, len(visible_headers), n_cols)]
-            st.markdown("**Edit Product Details**")
-            required_fields = [barcode_col, framecode_col]
-            for row in header_rows:
-                cols = st.columns(len(row), gap="small")
-                for idx, header in enumerate(row):
-                    value = product[header] if header in product else ""
-                    show_value = clean_barcode(value) if header in [barcode_col, framecode_col] else value
-                    unique_key = f"edit_textinput_{header}_{selected_row}"
-                    smart_suggestion = get_smart_default(header, df)
-                    if header in [barcode_col, framecode_col]:
-                        label = header
-                    else:
-                        label = f"{header} <span class='required-label'>*</span>" if header in required_fields else header
-                    if header == barcode_col or header == framecode_col:
-                        edit_values[header] = cols[idx].text_input(label, value=str(show_value), key=unique_key)
-                    elif header.upper() == "MANUFACT":
-                        edit_values[header] = cols[idx].text_input("MANUFACTURER", value=str(show_value), key=unique_key)
-                    elif header.upper() == "FCOLOUR":
-                        edit_values[header] = cols[idx].text_input("COLOUR", value=str(show_value), key=unique_key)
-                    elif header.upper() == "FRAMETYPE":
-                        default_frametype = str(show_value) if str(show_value) in FRAMETYPE_OPTIONS else FRAMETYPE_OPTIONS[0]
-                        edit_values[header] = cols[idx].selectbox("FRAME TYPE", FRAMETYPE_OPTIONS, index=FRAMETYPE_OPTIONS.index(default_frametype), key=unique_key)
-                    elif header.upper() == "AVAILFROM":
-                        try:
-                            if pd.isnull(show_value) or show_value == "":
+@st.fragment
+def edit_product_section():
+    with st.expander("✏️ Edit or 🗑 Delete Products", expanded=st.session_state["edit_delete_expanded"]):
+        if len(df) > 0:
+            product_labels = load_product_labels(INVENTORY_FILE, inventory_mtime)
+            selected_row = st.selectbox(
+                "Select a product to edit or delete",
+                options=df.index.tolist(),
+                format_func=lambda i: product_labels[i],
+                key="selected_product"
+            )
+            if selected_row is not None:
+                st.session_state["edit_product_index"] = selected_row
+                product = df.loc[selected_row]
+                edit_values = {}
+                st.markdown("**Edit Product Details**")
+                required_fields = [barcode_col, framecode_col]
+                for row in header_rows:
+                    cols = st.columns(len(row), gap="small")
+                    for idx, header in enumerate(row):
+                        value = product[header] if header in product else ""
+                        show_value = clean_barcode(value) if header in [barcode_col, framecode_col] else value
+                        unique_key = f"edit_textinput_{header}_{selected_row}"
+                        smart_suggestion = get_smart_default(header, smart_defaults)
+                        if header in [barcode_col, framecode_col]:
+                            label = header
+                        else:
+                            label = f"{header} <span class='required-label'>*</span>" if header in required_fields else header
+                        if header == barcode_col or header == framecode_col:
+                            edit_values[header] = cols[idx].text_input(label, value=str(show_value), key=unique_key)
+                        elif header.upper() == "MANUFACT":
+                            edit_values[header] = cols[idx].text_input("MANUFACTURER", value=str(show_value), key=unique_key)
+                        elif header.upper() == "FCOLOUR":
+                            edit_values[header] = cols[idx].text_input("COLOUR", value=str(show_value), key=unique_key)
+                        elif header.upper() == "FRAMETYPE":
+                            edit_values[header] = cols[idx].selectbox("FRAME TYPE", FRAMETYPE_OPTIONS, index=FRAMETYPE_INDEX.get(str(show_value), 0), key=unique_key)
+                        elif header.upper() == "AVAILFROM":
+                            try:
+                                if pd.isnull(show_value) or show_value == "":
+                                    date_val = datetime.now().date()
+                                else:
+                                    date_val = pd.to_datetime(show_value).date()
+                            except Exception:
                                 date_val = datetime.now().date()
-                            else:
-                                date_val = pd.to_datetime(show_value).date()
-                        except Exception:
-                            date_val = datetime.now().date()
-                        edit_values[header] = cols[idx].date_input("AVAILABLE FROM", value=date_val, key=unique_key)
-                    elif header.upper() == "SUPPLIER":
-                        edit_values[header] = cols[idx].text_input(header, value=str(show_value), key=unique_key)
-                    elif header.lower() == "model":
-                        edit_values[header] = cols[idx].text_input(header, value=str(show_value), key=unique_key)
-                    elif header.lower() == "size":
-                        default_size = str(show_value) if str(show_value) in SIZE_OPTIONS else SIZE_OPTIONS[0]
-                        edit_values[header] = cols[idx].selectbox(header, SIZE_OPTIONS, index=SIZE_OPTIONS.index(default_size), key=unique_key)
-                    elif header.upper() in FREE_TEXT_FIELDS:
-                        edit_values[header] = cols[idx].text_input(header, value=str(show_value), key=unique_key)
-                    elif header.upper() == "QUANTITY":
-                        try:
-                            default_qty = int(str(show_value)) if str(show_value).isdigit() else 1
-                        except:
-                            default_qty = 1
-                        edit_values[header] = cols[idx].number_input(header, min_value=0, value=default_qty, key=unique_key)
-                    elif header.upper() == "F TYPE":
-                        default_ftype = str(show_value) if str(show_value) in F_TYPE_OPTIONS else F_TYPE_OPTIONS[0]
-                        edit_values[header] = cols[idx].selectbox(header, F_TYPE_OPTIONS, index=F_TYPE_OPTIONS.index(default_ftype), key=unique_key)
-                    elif header.upper() == "FRSTATUS":
-                        default_status = str(show_value) if str(show_value) in FRSTATUS_OPTIONS else FRSTATUS_OPTIONS[1]
-                        edit_values[header] = cols[idx].selectbox(header, FRSTATUS_OPTIONS, index=FRSTATUS_OPTIONS.index(default_status), key=unique_key)
-                    elif header.upper() in ["TEMPLE", "DEPTH", "DIAG", "EXCOSTPR", "COST PRICE"]:
-                        edit_values[header] = cols[idx].text_input(header, value=str(show_value), key=unique_key)
-                    elif header.upper() == "RRP":
-                        edit_values[header] = cols[idx].text_input(header, value=format_rrp(show_value), key=unique_key)
-                    elif header.upper() == "TAXPC":
-                        default_tax = str(show_value) if str(show_value) in TAXPC_OPTIONS else TAXPC_OPTIONS[9]
-                        edit_values[header] = cols[idx].selectbox(header, TAXPC_OPTIONS, index=max(0, TAXPC_OPTIONS.index(default_tax)), key=unique_key)
-                    elif header.upper() == "NOTE":
-                        edit_values[header] = cols[idx].text_input(header, value=str(show_value), key=unique_key)
-                    else:
-                        edit_values[header] = cols[idx].text_input(header, value=str(show_value), key=unique_key)
-            with st.form(key=f"edit_form_{selected_row}"):
-                col1, col2 = st.columns(2)
-                submit_edit = col1.form_submit_button("Save Changes")
-                submit_delete = col2.form_submit_button("Delete Product")
-                if submit_edit:
-                    if "AVAILFROM" in edit_values and isinstance(edit_values["AVAILFROM"], (datetime, pd.Timestamp)):
-                        edit_values["AVAILFROM"] = edit_values["AVAILFROM"].strftime('%Y-%m-%d')
-                    edit_barcode_cleaned = clean_barcode(edit_values[barcode_col])
-                    edit_framecode_cleaned = clean_barcode(edit_values[framecode_col])
-                    df_barcodes_cleaned = df[barcode_col].map(clean_barcode)
-                    df_framecodes_cleaned = df[framecode_col].map(clean_barcode)
-                    duplicate_barcode = (df_barcodes_cleaned == edit_barcode_cleaned) & (df.index != selected_row)
-                    duplicate_framecode = (df_framecodes_cleaned == edit_framecode_cleaned) & (df.index != selected_row)
-                    if duplicate_barcode.any():
-                        st.error("❌ Another product with this barcode already exists!")
-                    elif duplicate_framecode.any():
-                        st.error("❌ Another product with this framecode already exists!")
-                    else:
-                        for h in headers:
-                            if h in edit_values:
-                                val = edit_values[h]
+                            edit_values[header] = cols[idx].date_input("AVAILABLE FROM", value=date_val, key=unique_key)
+                        elif header.upper() == "SUPPLIER":
+                            edit_values[header] = cols[idx].text_input(header, value=str(show_value), key=unique_key)
+                        elif header.lower() == "model":
+                            edit_values[header] = cols[idx].text_input(header, value=str(show_value), key=unique_key)
+                        elif header.lower() == "size":
+                            edit_values[header] = cols[idx].selectbox(header, SIZE_OPTIONS, index=SIZE_INDEX.get(str(show_value), 0), key=unique_key)
+                        elif header.upper() in FREE_TEXT_FIELDS:
+                            edit_values[header] = cols[idx].text_input(header, value=str(show_value), key=unique_key)
+                        elif header.upper() == "QUANTITY":
+                            try:
+                                default_qty = int(str(show_value)) if str(show_value).isdigit() else 1
+                            except:
+                                default_qty = 1
+                            edit_values[header] = cols[idx].number_input(header, min_value=0, value=default_qty, key=unique_key)
+                        elif header.upper() == "F TYPE":
+                            edit_values[header] = cols[idx].selectbox(header, F_TYPE_OPTIONS, index=F_TYPE_INDEX.get(str(show_value), 0), key=unique_key)
+                        elif header.upper() == "FRSTATUS":
+                            edit_values[header] = cols[idx].selectbox(header, FRSTATUS_OPTIONS, index=FRSTATUS_INDEX.get(str(show_value), 1), key=unique_key)
+                        elif header.upper() in ["TEMPLE", "DEPTH", "DIAG", "EXCOSTPR", "COST PRICE"]:
+                            edit_values[header] = cols[idx].text_input(header, value=str(show_value), key=unique_key)
+                        elif header.upper() == "RRP":
+                            edit_values[header] = cols[idx].text_input(header, value=format_rrp(show_value), key=unique_key)
+                        elif header.upper() == "TAXPC":
+                            edit_values[header] = cols[idx].selectbox(header, TAXPC_OPTIONS, index=TAXPC_INDEX.get(str(show_value), 9), key=unique_key)
+                        elif header.upper() == "NOTE":
+                            edit_values[header] = cols[idx].text_input(header, value=str(show_value), key=unique_key)
+                        else:
+                            edit_values[header] = cols[idx].text_input(header, value=str(show_value), key=unique_key)
+                with st.form(key=f"edit_form_{selected_row}"):
+                    col1, col2 = st.columns(2)
+                    submit_edit = col1.form_submit_button("Save Changes")
+                    submit_delete = col2.form_submit_button("Delete Product")
+                    if submit_edit:
+                        if "AVAILFROM" in edit_values and isinstance(edit_values["AVAILFROM"], (datetime, pd.Timestamp)):
+                            edit_values["AVAILFROM"] = edit_values["AVAILFROM"].strftime('%Y-%m-%d')
+                        edit_barcode_cleaned = clean_barcode(edit_values[barcode_col])
+                        edit_framecode_cleaned = clean_barcode(edit_values[framecode_col])
+                        if exists_in_other_row(barcode_index, edit_barcode_cleaned, selected_row):
+                            st.error("❌ Another product with this barcode already exists!")
+                        elif exists_in_other_row(framecode_index, edit_framecode_cleaned, selected_row):
+                            st.error("❌ Another product with this framecode already exists!")
+                        else:
+                            updated_row = {}
+                            for h in headers:
+                                val = edit_values.get(h, "")
                                 if h == "AVAILFROM" and isinstance(val, (datetime, pd.Timestamp)):
                                     val = val.strftime('%Y-%m-%d')
-                                if h == "BARCODE":
-                                    val = clean_barcode(val)
-                                if h == "RRP":
-                                    val = format_rrp(val)
+                                updated_row[h] = val
+                            if "Timestamp" in df.columns:
+                                updated_row["Timestamp"] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                            for h, val in clean_row(updated_row).items():
                                 df.at[selected_row, h] = val
-                            else:
-                                df.at[selected_row, h] = ""
-                        if "Timestamp" in df.columns:
-                            df.at[selected_row, "Timestamp"] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                        df = clean_nans(df)
-                        df = force_all_columns_to_string(df)
-                        df[barcode_col] = df[barcode_col].map(clean_barcode)
-                        if "RRP" in df.columns:
-                            df["RRP"] = df["RRP"].apply(format_rrp)
-                        if INVENTORY_FILE.lower().endswith('.xlsx'):
-                            df.to_excel(INVENTORY_FILE, index=False)
-                        else:
-                            df.to_csv(INVENTORY_FILE, index=False)
-                        st.success("✅ Product updated successfully!")
-                        st.session_state["edit_delete_expanded"] = True
+                            save_inventory(df, INVENTORY_FILE)
+                            clear_inventory_caches()
+                            st.success("✅ Product updated successfully!")
+                            st.session_state["edit_delete_expanded"] = True
+                            st.rerun()
+                    if submit_delete:
+                        st.session_state["pending_delete_index"] = selected_row
                         st.rerun()
-                if submit_delete:
-                    st.session_state["pending_delete_index"] = selected_row
 
-    else:
-        st.info("ℹ️ No products in inventory yet.")
+        else:
+            st.info("ℹ️ No products in inventory yet.")
+
+edit_product_section()
 
 if st.session_state.get("pending_delete_index") is not None:
     st.warning(f"⚠️ Are you sure you want to delete product with barcode '{clean_barcode(df.at[st.session_state['pending_delete_index'], barcode_col])}' and framecode '{clean_barcode(df.at[st.session_state['pending_delete_index'], framecode_col])}'?")
@@ -567,15 +672,8 @@ if st.session_state.get("pending_delete_index") is not None:
     with confirm_col:
         if st.button("Confirm Delete", key="confirm_delete_btn"):
             df = df.drop(st.session_state["pending_delete_index"]).reset_index(drop=True)
-            df = clean_nans(df)
-            df = force_all_columns_to_string(df)
-            df[barcode_col] = df[barcode_col].map(clean_barcode)
-            if "RRP" in df.columns:
-                df["RRP"] = df["RRP"].apply(format_rrp)
-            if INVENTORY_FILE.lower().endswith('.xlsx'):
-                df.to_excel(INVENTORY_FILE, index=False)
-            else:
-                df.to_csv(INVENTORY_FILE, index=False)
+            save_inventory(df, INVENTORY_FILE)
+            clear_inventory_caches()
             st.success("✅ Product deleted successfully!")
             st.session_state["edit_product_index"] = None
             st.session_state["edit_delete_expanded"] = True
@@ -590,22 +688,14 @@ with st.expander("📦 Stock Count"):
     uploaded_file = st.file_uploader("Upload scanned barcodes", type=["csv", "xlsx", "txt"])
     if uploaded_file is not None:
         try:
-            if uploaded_file.name.endswith(".csv"):
-                scanned_df = pd.read_csv(uploaded_file)
-            elif uploaded_file.name.endswith(".xlsx"):
-                scanned_df = pd.read_excel(uploaded_file)
-            elif uploaded_file.name.endswith(".txt"):
-                scanned_df = pd.read_csv(uploaded_file, delimiter=None)
-            else:
+            scanned_df = read_scanned_file(uploaded_file.name, uploaded_file.getvalue())
+            if scanned_df is None:
                 st.error("❌ Unsupported file type.")
-                scanned_df = None
         except Exception as e:
             st.error(f"❌ Error reading file: {e}")
             scanned_df = None
 
         if scanned_df is not None:
-            scanned_df = force_all_columns_to_string(scanned_df)
-            scanned_df[barcode_col] = scanned_df[barcode_col].map(clean_barcode)
             st.write("Preview of your uploaded file:")
             st.dataframe(clean_nans(scanned_df.head()), width='stretch')
             barcode_candidates = [
@@ -617,21 +707,20 @@ with st.expander("📦 Stock Count"):
             barcode_column = st.selectbox(
                 "Select the column containing barcodes", barcode_candidates
             )
-            inventory_barcodes = set(df[barcode_col].map(clean_barcode))
-            scanned_barcodes = set(scanned_df[barcode_column].map(clean_barcode))
-            matched = inventory_barcodes & scanned_barcodes
-            missing = inventory_barcodes - scanned_barcodes
-            unexpected = scanned_barcodes - inventory_barcodes
+            scanned_index = scanned_barcode_index(uploaded_file.name, uploaded_file.getvalue(), barcode_column)
+            matched = barcode_index.intersection(scanned_index)
+            missing = barcode_index.difference(scanned_index)
+            unexpected = scanned_index.difference(barcode_index)
             st.success(f"✅ Matched items: {len(matched)}")
             st.warning(f"⚠️ Missing items: {len(missing)}")
             st.error(f"❌ Unexpected items: {len(unexpected)}")
-            if matched:
+            if len(matched):
                 st.write("✅ Present items:")
-                st.dataframe(clean_nans(df[df[barcode_col].map(clean_barcode).isin(matched)]), width='stretch')
-            if missing:
+                show_stock_count_rows(df[barcode_index.isin(matched)])
+            if len(missing):
                 st.write("❌ Missing items:")
-                st.dataframe(clean_nans(df[df[barcode_col].map(clean_barcode).isin(missing)]), width='stretch')
-            if unexpected:
+                show_stock_count_rows(df[barcode_index.isin(missing)])
+            if len(unexpected):
                 st.write("⚠️ Unexpected items (not in system):")
                 st.write(list(unexpected))
 
@@ -640,19 +729,21 @@ with st.expander("🔍 Quick Stock Check (Scan Barcode)"):
     scanned_barcode = st.text_input("Scan Barcode", value="", key="stock_check_barcode_input")
     if scanned_barcode:
         cleaned_input = clean_barcode(scanned_barcode)
-        matches = df[df[barcode_col].map(clean_barcode) == cleaned_input]
+        if cleaned_input in barcode_index:
+            matches = df.iloc[barcode_index.get_indexer_for([cleaned_input])]
+        else:
+            matches = df.iloc[0:0]
         if not matches.empty:
-            matches = force_all_columns_to_string(matches)
             st.success("✅ Product found:")
             matches_display = matches.copy()
             if "RRP" in matches_display.columns:
-                matches_display["RRP"] = matches_display["RRP"].apply(format_rrp)
+                matches_display["RRP"] = format_rrp_series(matches_display["RRP"])
             if "BARCODE" in matches_display.columns:
-                matches_display["BARCODE"] = matches_display["BARCODE"].map(clean_barcode)
+                matches_display["BARCODE"] = vec_clean_barcode(matches_display["BARCODE"])
             st.dataframe(clean_nans(matches_display), width='stretch')
             product = matches.iloc[0]
             barcode_value = clean_barcode(product[barcode_col])
-            barcode_img_buffer = generate_barcode_image(barcode_value)
+            barcode_img_bytes = generate_barcode_image(barcode_value)
             rrp = str(product.get("RRP", ""))
             rrp_display = format_rrp(rrp)
             framecode = str(product.get("FRAMENUM", ""))
@@ -662,20 +753,23 @@ with st.expander("🔍 Quick Stock Check (Scan Barcode)"):
             frametype = str(product.get("FRAMETYPE", ""))
             availfrom = str(product.get("AVAILFROM", ""))
             size = str(product.get("SIZE", ""))
-            st.markdown('<div class="print-label-block">', unsafe_allow_html=True)
-            if barcode_img_buffer:
-                st.image(barcode_img_buffer, width=220)
-            st.markdown(f'<div class="print-label-barcode-num">{barcode_value}</div>', unsafe_allow_html=True)
-            st.markdown(f'<div class="print-label-price">{rrp_display}</div>', unsafe_allow_html=True)
-            st.markdown(f'<div class="print-label-gst">Inc GST</div>', unsafe_allow_html=True)
-            st.markdown('<div class="print-label-details">', unsafe_allow_html=True)
-            st.markdown(f'Framecode: {framecode}', unsafe_allow_html=True)
-            st.markdown(f'Model: {model}', unsafe_allow_html=True)
-            st.markdown(f'Manufacturer: {manufact}', unsafe_allow_html=True)
-            st.markdown(f'Colour: {fcolour}', unsafe_allow_html=True)
-            st.markdown(f'Frame Type: {frametype}', unsafe_allow_html=True)
-            st.markdown(f'Available From: {availfrom}', unsafe_allow_html=True)
-            st.markdown(f'Size: {size}', unsafe_allow_html=True)
-            st.markdown('</div></div>', unsafe_allow_html=True)
+            if barcode_img_bytes:
+                st.image(barcode_img_bytes, width=220)
+            label_details = "\n\n".join([
+                f'Framecode: {framecode}',
+                f'Model: {model}',
+                f'Manufacturer: {manufact}',
+                f'Colour: {fcolour}',
+                f'Frame Type: {frametype}',
+                f'Available From: {availfrom}',
+                f'Size: {size}',
+            ])
+            st.markdown(
+                f'<div class="print-label-barcode-num">{barcode_value}</div>\n\n'
+                f'<div class="print-label-price">{rrp_display}</div>\n\n'
+                f'<div class="print-label-gst">Inc GST</div>\n\n'
+                f'<div class="print-label-details">\n\n{label_details}\n\n</div>',
+                unsafe_allow_html=True,
+            )
         else:
             st.error("❌ Barcode not found in inventory.")
@@ -1,11 +1,22 @@
 from flask import Flask, render_template, request, jsonify, redirect, url_for
 import openpyxl
 import os
+import pandas as pd
+from inventory_store import canonical_inventory, inventory_store_path, read_workbook_values, store_is_current
 
 app = Flask(__name__)
 
 EXCEL_PATH = 'inventory.xlsx'
 
+def iter_inventory_rows(excel_path):
+    # both sources yield the app's schema: FRAMENUM, cleaned BARCODE first, $-formatted RRP, all strings
+    if store_is_current(excel_path):
+        df = pd.read_parquet(inventory_store_path(excel_path))
+    else:
+        df = canonical_inventory(read_workbook_values(excel_path))
+    yield tuple(df.columns)
+    yield from df.itertuples(index=False, name=None)
+
 def get_inventory_headers(excel_path=EXCEL_PATH):
     if not os.path.exists(excel_path):
         wb = openpyxl.Workbook()
@@ -14,26 +25,29 @@ def get_inventory_headers(excel_path=EXCEL_PATH):
         ws.append(default_headers)
         wb.save(excel_path)
         return default_headers
-    wb = openpyxl.load_workbook(excel_path)
-    ws = wb.active
-    headers = [cell.value for cell in next(ws.iter_rows(max_row=1))]
-    return headers
+    rows = iter_inventory_rows(excel_path)
+    try:
+        return list(next(rows, ()))
+    finally:
+        rows.close()
 
 def find_product_by_barcode(barcode, excel_path=EXCEL_PATH):
-    wb = openpyxl.load_workbook(excel_path)
-    ws = wb.active
-    headers = [cell.value for cell in next(ws.iter_rows(max_row=1))]
-    barcode_column = None
-    for idx, header in enumerate(headers):
-        if str(header).lower() == "barcode":
-            barcode_column = idx
-            break
-    if barcode_column is None:
+    rows = iter_inventory_rows(excel_path)
+    try:
+        headers = list(next(rows, ()))
+        barcode_column = None
+        for idx, header in enumerate(headers):
+            if str(header).lower() == "barcode":
+                barcode_column = idx
+                break
+        if barcode_column is None:
+            return None
+        for row in rows:
+            if str(row[barcode_column]).strip() == str(barcode).strip():
+                return dict(zip(headers, row))
         return None
-    for row in ws.iter_rows(min_row=2, values_only=True):
-        if str(row[barcode_column]).strip() == str(barcode).strip():
-            return dict(zip(headers, row))
-    return None
+    finally:
+        rows.close()
 
 @app.route('/scan')
 def scan():
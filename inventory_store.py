@@ -0,0 +1,80 @@
+import os
+import numpy as np
+import openpyxl
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+SOURCE_STAMP_KEY = b"inventory_source"
+
+
+def clean_and_stringify(df):
+    return df.fillna('').replace('nan', '').astype(str)
+
+
+def vec_clean_barcode(series):
+    s = series.fillna("").astype(str).str.strip()
+    s = s.str.replace('\u200b', '', regex=False).str.replace('\u00A0', '', regex=False)
+    num = pd.to_numeric(s, errors='coerce').astype(float)
+    ok = np.isfinite(num) & (num.abs() < 2**63)
+    ints = num.where(ok, 0).astype('int64').astype(str)
+    return pd.Series(np.where(ok, ints, s), index=series.index)
+
+
+def format_rrp_series(series):
+    values = pd.to_numeric(series.astype(str).str.replace("$", "", regex=False).str.strip(), errors='coerce')
+    return "$" + values.fillna(0.0).map("{:.2f}".format)
+
+
+def canonical_inventory(df):
+    df = clean_and_stringify(df).rename(columns={"FRAME NO.": "FRAMENUM"})
+    if "BARCODE" in df.columns:
+        df["BARCODE"] = vec_clean_barcode(df["BARCODE"])
+        cols = list(df.columns)
+        cols.insert(0, cols.pop(cols.index("BARCODE")))
+        df = df[cols]
+    if "RRP" in df.columns:
+        df["RRP"] = format_rrp_series(df["RRP"])
+    return df.astype("string[pyarrow]")
+
+
+def read_workbook_values(path):
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb.active.values
+        header = [h if h is not None else f"Unnamed: {i}" for i, h in enumerate(next(rows, ()))]
+        df = pd.DataFrame(rows, columns=header)
+    finally:
+        wb.close()
+    # read_only mode pads the sheet with trailing empty rows; pd.read_excel drops only those
+    filled = np.flatnonzero(df.notna().any(axis=1).to_numpy())
+    return df.iloc[:filled[-1] + 1 if len(filled) else 0]
+
+
+def inventory_store_path(path):
+    return path + ".parquet"
+
+
+def source_stamp(path):
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}".encode()
+
+
+def inventory_version(path):
+    stamps = [source_stamp(p) for p in (path, inventory_store_path(path)) if os.path.exists(p)]
+    return tuple(stamps) if stamps else None
+
+
+def write_inventory_store(df, path):
+    # remember which workbook the edits were made on top of
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = {**(table.schema.metadata or {}), SOURCE_STAMP_KEY: source_stamp(path)}
+    pq.write_table(table.replace_schema_metadata(metadata), inventory_store_path(path))
+
+
+def store_is_current(path):
+    store = inventory_store_path(path)
+    if not (path.lower().endswith('.xlsx') and os.path.exists(path) and os.path.exists(store)):
+        return False
+    metadata = pq.read_schema(store).metadata or {}
+    return metadata.get(SOURCE_STAMP_KEY) == source_stamp(path)
@@ -0,0 +1,46 @@
+import openpyxl
+import pandas as pd
+
+import barcode_server
+from inventory_store import write_inventory_store
+
+
+def make_workbook(path):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(["Barcode", "Product Name", "Quantity"])
+    ws.append([123, "Frame", 2])
+    wb.save(path)
+
+
+def test_reads_workbook_without_store(tmp_path):
+    path = str(tmp_path / "inventory.xlsx")
+    make_workbook(path)
+    assert barcode_server.get_inventory_headers(path) == ["Barcode", "Product Name", "Quantity"]
+    assert barcode_server.find_product_by_barcode("123", path)["Product Name"] == "Frame"
+
+
+def test_reads_current_parquet_store(tmp_path):
+    path = str(tmp_path / "inventory.xlsx")
+    make_workbook(path)
+    write_inventory_store(
+        pd.DataFrame({"Barcode": ["123", "456"], "Product Name": ["Edited", "New"], "Quantity": ["3", "1"]}), path
+    )
+    assert barcode_server.find_product_by_barcode("123", path)["Product Name"] == "Edited"
+    assert barcode_server.find_product_by_barcode("456", path)["Quantity"] == "1"
+    assert barcode_server.find_product_by_barcode("789", path) is None
+
+
+def test_workbook_and_store_rows_share_one_schema(tmp_path):
+    path = str(tmp_path / "inventory.xlsx")
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(["FRAME NO.", "BARCODE", "MODEL", "RRP"])
+    ws.append(["ESS000141", 10239, "OGH 318", 80])
+    wb.save(path)
+    from_workbook = barcode_server.find_product_by_barcode("10239", path)
+    assert from_workbook == {"BARCODE": "10239", "FRAMENUM": "ESS000141", "MODEL": "OGH 318", "RRP": "$80.00"}
+    write_inventory_store(pd.DataFrame([from_workbook], dtype="string[pyarrow]"), path)
+    assert barcode_server.store_is_current(path)
+    assert barcode_server.get_inventory_headers(path) == list(from_workbook)
+    assert barcode_server.find_product_by_barcode("10239", path) == from_workbook
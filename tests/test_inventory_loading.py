@@ -0,0 +1,90 @@
+import io
+import openpyxl
+import pandas as pd
+import pytest
+
+
+def load_with(im, monkeypatch, path, use_calamine):
+    monkeypatch.setattr(im, "HAS_CALAMINE", use_calamine)
+    return im.load_inventory.__wrapped__(path, None)
+
+
+@pytest.fixture
+def whitespace_workbook(tmp_path):
+    path = str(tmp_path / "inventory.xlsx")
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(["BARCODE", "FRAMENUM", "MODEL", "NOTE", "RRP"])
+    ws.append(["10239", "ESS000141", " ", "  ", "80"])
+    ws.append(["10240", "ESS000142", " OGH 318 ", "\t", "$95.5"])
+    ws.append([" ", " ", " ", " ", " "])
+    ws.append(["10241", "ESS000143", "OGH 319", "\xa0", ""])
+    wb.save(path)
+    return path
+
+
+@pytest.fixture
+def padded_workbook(tmp_path):
+    path = str(tmp_path / "padded.xlsx")
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(["BARCODE", "FRAMENUM", "MODEL", "RRP"])
+    ws.append(["10239", "ESS000141", "OGH 317", "80"])
+    ws.append([None, None, None, None])
+    ws.append(["10240", "ESS000142", "", "$95.5"])
+    ws["A8"] = None
+    wb.save(path)
+    return path
+
+
+def blank_whitespace(df):
+    return df.mask(df.apply(lambda col: col.str.strip() == ""), "")
+
+
+def test_calamine_and_openpyxl_paths_match(inventory_manager, monkeypatch, padded_workbook):
+    pytest.importorskip("python_calamine")
+    via_calamine = load_with(inventory_manager, monkeypatch, padded_workbook, True)
+    via_openpyxl = load_with(inventory_manager, monkeypatch, padded_workbook, False)
+    pd.testing.assert_frame_equal(via_calamine, via_openpyxl)
+    assert len(via_openpyxl) == 3
+    # calamine cannot return whitespace-only cells, so the shipped sheet only matches outside them
+    path = inventory_manager.INVENTORY_FILE
+    via_calamine = load_with(inventory_manager, monkeypatch, path, True)
+    via_openpyxl = load_with(inventory_manager, monkeypatch, path, False)
+    pd.testing.assert_frame_equal(blank_whitespace(via_calamine), blank_whitespace(via_openpyxl))
+
+
+def test_openpyxl_keeps_whitespace_only_cells(inventory_manager, monkeypatch, whitespace_workbook):
+    df = load_with(inventory_manager, monkeypatch, whitespace_workbook, False)
+    assert len(df) == 4
+    assert df["MODEL"].tolist() == [" ", " OGH 318 ", " ", "OGH 319"]
+    assert df["NOTE"].tolist() == ["  ", "\t", " ", "\xa0"]
+
+
+def test_every_load_path_returns_arrow_strings(inventory_manager, monkeypatch, whitespace_workbook):
+    im = inventory_manager
+    for use_calamine in (True, False):
+        if use_calamine and not im.HAS_CALAMINE:
+            continue
+        fresh = load_with(im, monkeypatch, whitespace_workbook, use_calamine)
+        assert (fresh.dtypes == "string[pyarrow]").all()
+    im.save_inventory(fresh, whitespace_workbook)
+    assert im.store_is_current(whitespace_workbook)
+    stored = im.load_inventory.__wrapped__(whitespace_workbook, None)
+    assert (stored.dtypes == "string[pyarrow]").all()
+    pd.testing.assert_frame_equal(stored, fresh)
+
+
+def test_archive_load_returns_arrow_strings(inventory_manager, whitespace_workbook):
+    df = inventory_manager.load_archive_inventory.__wrapped__(whitespace_workbook, None)
+    assert (df.dtypes == "string[pyarrow]").all()
+
+
+def test_write_xlsx_streams_into_bytesio(inventory_manager, monkeypatch, whitespace_workbook):
+    im = inventory_manager
+    df = load_with(im, monkeypatch, whitespace_workbook, False)
+    buffer = io.BytesIO()
+    im.write_xlsx(df, buffer)
+    buffer.seek(0)
+    round_trip = pd.read_excel(buffer, dtype=str).fillna("")
+    pd.testing.assert_frame_equal(round_trip, df.astype(object), check_dtype=False)
@@ -0,0 +1,43 @@
+import os
+
+import openpyxl
+import pandas as pd
+
+from inventory_store import inventory_store_path, inventory_version, store_is_current, write_inventory_store
+
+
+def make_workbook(path, model):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(["BARCODE", "MODEL"])
+    ws.append(["10239", model])
+    wb.save(path)
+
+
+def test_store_is_current_until_the_workbook_changes(tmp_path):
+    path = str(tmp_path / "inventory.xlsx")
+    make_workbook(path, "OGH 318")
+    assert not store_is_current(path)
+    write_inventory_store(pd.DataFrame({"BARCODE": ["10239"], "MODEL": ["Edited"]}), path)
+    assert store_is_current(path)
+    make_workbook(path, "Replaced")
+    assert not store_is_current(path)
+
+
+def test_restored_workbook_with_older_mtime_wins_over_store(tmp_path):
+    path = str(tmp_path / "inventory.xlsx")
+    make_workbook(path, "OGH 318")
+    write_inventory_store(pd.DataFrame({"BARCODE": ["10239"], "MODEL": ["Edited"]}), path)
+    before = inventory_version(path)
+    make_workbook(path, "Restored backup")
+    os.utime(path, (0, 0))
+    assert os.path.getmtime(path) < os.path.getmtime(inventory_store_path(path))
+    assert not store_is_current(path)
+    assert inventory_version(path) != before
+
+
+def test_store_without_source_stamp_is_ignored(tmp_path):
+    path = str(tmp_path / "inventory.xlsx")
+    make_workbook(path, "OGH 318")
+    pd.DataFrame({"BARCODE": ["10239"], "MODEL": ["Edited"]}).to_parquet(inventory_store_path(path), index=False)
+    assert not store_is_current(path)